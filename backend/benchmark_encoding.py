@@ -0,0 +1,96 @@
+"""Compare bytes-on-wire and encode cost of the list response formats.
+
+Run from the backend directory: python benchmark_encoding.py [num_scrims]
+"""
+import gzip
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from server import VALORANT_MAPS, msgpack, to_columnar
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPEATS = 20
+
+def make_scrims(count: int) -> list:
+    """Synthetic board shaped like the /api/scrims payload"""
+    random.seed(42)
+    now = datetime.utcnow()
+    scrims = []
+    for i in range(count):
+        applications = [
+            {
+                "application_id": str(uuid.uuid4()),
+                "team_id": str(uuid.uuid4()),
+                "team_name": f"Applicant Team {random.randint(1, 5000)}",
+                "selected_maps": random.sample(VALORANT_MAPS, 2),
+                "preferred_rounds": random.choice([13, 24]),
+                "preferred_games": random.randint(1, 3),
+                "message": "GLHF, we can do later if needed",
+                "status": "pending",
+                "applied_at": now - timedelta(minutes=random.randint(1, 600))
+            }
+            for _ in range(random.randint(0, 4))
+        ]
+        scrims.append({
+            "scrim_id": str(uuid.uuid4()),
+            "team_id": str(uuid.uuid4()),
+            "team_name": f"Team {i}",
+            "title": f"Looking for scrims tonight #{i}",
+            "description": "Practice block, comms in English, please be on time.",
+            "maps": random.sample(VALORANT_MAPS, random.randint(1, 3)),
+            "max_rounds": random.choice([13, 24]),
+            "num_games": random.randint(1, 3),
+            "scheduled_time": now + timedelta(hours=random.randint(1, 72)),
+            "max_participants": 2,
+            "applications": applications,
+            "status": "open",
+            "tier": random.choice(["public", "tier_3", "tier_2", "tier_1"]),
+            "created_at": now,
+            "updated_at": now
+        })
+    return jsonable_encoder(scrims)
+
+def timed(encode, data) -> tuple:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        payload = encode(data)
+    return payload, (time.perf_counter() - start) / REPEATS * 1000
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    data = make_scrims(count)
+
+    formats = {
+        "json": lambda d: json.dumps(d).encode(),
+        "columnar": lambda d: json.dumps(to_columnar(d)).encode()
+    }
+    if msgpack is not None:
+        formats["msgpack"] = msgpack.packb
+
+    compressors = {"identity": None, "gzip": lambda b: gzip.compress(b, 6)}
+    if brotli is not None:
+        compressors["br"] = lambda b: brotli.compress(b, quality=4)
+
+    print(f"{count} scrims, mean of {REPEATS} runs")
+    print(f"{'format':<10} {'encoding':<10} {'bytes':>10} {'encode ms':>10} {'compress ms':>12}")
+    for name, encode in formats.items():
+        payload, encode_ms = timed(encode, data)
+        for encoding, compress in compressors.items():
+            if compress is None:
+                body, compress_ms = payload, 0.0
+            else:
+                body, compress_ms = timed(compress, payload)
+            print(f"{name:<10} {encoding:<10} {len(body):>10} {encode_ms:>10.2f} {compress_ms:>12.2f}")
+
+if __name__ == "__main__":
+    main()
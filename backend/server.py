@@ -1,30 +1,52 @@
+import io
 import os
+import csv
+import json
+import time
+import asyncio
+import contextlib
 import uuid
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 import pymongo
 from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
 import jwt
 from passlib.context import CryptContext
 import logging
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
 # Initialize FastAPI
 app = FastAPI(title="Valorant Scrims API", version="1.0.0")
 
-# CORS configuration
+# CORS configuration, registered after the other middleware below so it wraps them
 CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "*").split(",")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+# Response compression, brotli when available with gzip for older clients
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
 
 # Database setup
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
@@ -43,6 +65,14 @@ users_collection = db.users
 teams_collection = db.teams
 scrims_collection = db.scrims
 tier_requests_collection = db.tier_requests
+rate_limits_collection = db.rate_limits
+team_schedule_collection = db.team_schedule
+analytics_state_collection = db.analytics_state
+analytics_scrim_stats_collection = db.analytics_scrim_stats
+analytics_map_tier_collection = db.analytics_map_tier
+analytics_tier_collection = db.analytics_tier
+analytics_hourly_collection = db.analytics_hourly
+events_collection = db.events
 
 # Security
 SECRET_KEY = "your-secret-key-change-in-production"
@@ -52,6 +82,16 @@ ACCESS_TOKEN_EXPIRE_HOURS = 24
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Scheduling: a single game is assumed to take this long when checking overlaps
+SCRIM_GAME_MINUTES = int(os.environ.get("SCRIM_GAME_MINUTES", "60"))
+MAX_GAMES_PER_SCRIM = 5
+# Longest possible slot, which bounds how far back an overlapping slot can start
+MAX_SLOT_LENGTH = timedelta(minutes=SCRIM_GAME_MINUTES * MAX_GAMES_PER_SCRIM)
+SCHEDULE_PAGE_LIMIT = 100
+# Lease on a team's schedule lock, so a crashed request cannot hold it forever
+SCHEDULE_LOCK_LEASE_SECONDS = 10
+SCHEDULE_LOCK_WAIT_SECONDS = 5
+
 # Valorant Maps
 VALORANT_MAPS = [
     "Ascent", "Bind", "Breeze", "Fracture", "Haven", "Icebox", 
@@ -151,6 +191,84 @@ def serialize_doc(doc):
         return result
     return doc
 
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+COLUMNAR_MEDIA_TYPE = "application/vnd.scrims.columnar+json"
+
+def to_columnar(items: List[dict]) -> dict:
+    """Turn a list of objects into one array per key so repeated keys are sent once.
+
+    Items lacking a key get null in that column, and their indexes are listed under
+    "missing" so the client can leave the key out again.
+    """
+    fields = []
+    for item in items:
+        for key in item:
+            if key not in fields:
+                fields.append(key)
+    columns = {}
+    missing = {}
+    for field in fields:
+        columns[field] = [item.get(field) for item in items]
+        absent = [i for i, item in enumerate(items) if field not in item]
+        if absent:
+            missing[field] = absent
+    result = {"length": len(items), "columns": columns}
+    if missing:
+        result["missing"] = missing
+    return result
+
+def parse_accept(accept: str) -> List[tuple]:
+    """Split an Accept header into (media range, q) pairs"""
+    ranges = []
+    for part in accept.split(","):
+        media_range, *params = [p.strip() for p in part.split(";")]
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media_range.lower(), q))
+    return ranges
+
+def negotiate_media_type(accept: str, offered: List[str]) -> str:
+    """Pick the offered type with the highest q; earlier offers win ties, the first is the fallback"""
+    ranges = parse_accept(accept) if accept else [("*/*", 1.0)]
+    best, best_q = offered[0], 0.0
+    for media_type in offered:
+        main_type = media_type.split("/")[0]
+        # The most specific matching range decides the quality of this type
+        q = None
+        for pattern in (media_type, f"{main_type}/*", "*/*"):
+            matches = [range_q for media_range, range_q in ranges if media_range == pattern]
+            if matches:
+                q = max(matches)
+                break
+        if q is not None and q > best_q:
+            best, best_q = media_type, q
+    return best
+
+def encode_list(request: Request, items: List[dict]) -> Response:
+    """Encode a list response in the format requested through the Accept header"""
+    data = jsonable_encoder(items)
+    # Plain JSON comes first so it wins ties such as a bare */*
+    offered = ["application/json", COLUMNAR_MEDIA_TYPE]
+    if msgpack is not None:
+        offered.append(MSGPACK_MEDIA_TYPE)
+    media_type = negotiate_media_type(request.headers.get("accept", ""), offered)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        response = Response(msgpack.packb(data), media_type=MSGPACK_MEDIA_TYPE)
+    elif media_type == COLUMNAR_MEDIA_TYPE:
+        response = JSONResponse(to_columnar(data), media_type=COLUMNAR_MEDIA_TYPE)
+    else:
+        response = JSONResponse(data)
+    response.headers["Vary"] = "Accept"
+    return response
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -187,13 +305,529 @@ def can_see_tier(user_tier: str, content_tier: str) -> bool:
     content_level = tier_hierarchy.get(content_tier, 0)
     return user_level >= content_level
 
+def scrim_slot(scheduled_time: datetime, num_games: int) -> tuple:
+    """Time range a scrim occupies on a team's calendar"""
+    games = min(max(1, num_games), MAX_GAMES_PER_SCRIM)
+    return scheduled_time, scheduled_time + timedelta(minutes=SCRIM_GAME_MINUTES * games)
+
+def find_schedule_conflict(team_id: str, start: datetime, end: datetime, exclude_scrim_id: Optional[str] = None):
+    """Return a committed slot of the team overlapping [start, end), if any"""
+    # The lower bound on start keeps the (team_id, start) scan to a window at most
+    # MAX_SLOT_LENGTH wide, however long the team's history is
+    query = {
+        "team_id": team_id,
+        "start": {"$gt": start - MAX_SLOT_LENGTH, "$lt": end},
+        "end": {"$gt": start}
+    }
+    if exclude_scrim_id:
+        query["scrim_id"] = {"$ne": exclude_scrim_id}
+    return team_schedule_collection.find_one(query)
+
+def book_team_slot(team_id: str, scrim: dict, role: str):
+    start, end = scrim_slot(scrim["scheduled_time"], scrim["num_games"])
+    team_schedule_collection.insert_one({
+        "team_id": team_id,
+        "scrim_id": scrim["scrim_id"],
+        "title": scrim["title"],
+        "tier": scrim["tier"],
+        "role": role,  # "host" or "guest"
+        "start": start,
+        "end": end
+    })
+
+@contextlib.asynccontextmanager
+async def team_schedule_lock(team_id: str):
+    """Serialise conflict checks and bookings for one team across requests and workers"""
+    token = str(uuid.uuid4())
+    deadline = time.monotonic() + SCHEDULE_LOCK_WAIT_SECONDS
+    while True:
+        now = datetime.utcnow()
+        acquired = teams_collection.find_one_and_update(
+            {
+                "team_id": team_id,
+                "$or": [
+                    {"schedule_lock_expires": {"$exists": False}},
+                    {"schedule_lock_expires": {"$lte": now}}
+                ]
+            },
+            {"$set": {
+                "schedule_lock": token,
+                "schedule_lock_expires": now + timedelta(seconds=SCHEDULE_LOCK_LEASE_SECONDS)
+            }}
+        )
+        if acquired:
+            break
+        if time.monotonic() > deadline:
+            raise HTTPException(
+                status_code=503,
+                detail="Team schedule is busy, please retry",
+                headers={"Retry-After": "1"}
+            )
+        await asyncio.sleep(0.05)
+    try:
+        yield
+    finally:
+        teams_collection.update_one(
+            {"team_id": team_id, "schedule_lock": token},
+            {"$unset": {"schedule_lock": "", "schedule_lock_expires": ""}}
+        )
+
+def visible_tiers(user_tier: str) -> List[str]:
+    """List the content tiers a user can see, for use in database queries"""
+    return [tier for tier in ["public", "tier_3", "tier_2", "tier_1"] if can_see_tier(user_tier, tier)]
+
+# Rate limiting / admission control
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# "memory" keeps buckets per worker, "mongo" shares them across workers
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_BUCKETS = int(os.environ.get("RATE_LIMIT_MAX_BUCKETS", "50000"))
+# X-Forwarded-For is only read when the request comes from one of these addresses
+TRUSTED_PROXIES = {ip.strip() for ip in os.environ.get("TRUSTED_PROXIES", "").split(",") if ip.strip()}
+
+# (capacity, refill window in seconds) per endpoint and scope.
+# Override with e.g. RATE_LIMIT_LOGIN_IP="10/60".
+RATE_LIMITS = {
+    "login": {"ip": (10, 60), "global": (50, 1)},
+    "register": {"ip": (5, 300), "global": (20, 1)},
+    "apply": {"user": (10, 60), "ip": (30, 60), "global": (100, 1)},
+}
+
+# Load shedding: requests in flight before each priority class gets 503s.
+# Board reads are "high" so they keep working while expensive writes are shed.
+MAX_INFLIGHT = int(os.environ.get("MAX_INFLIGHT", "200"))
+SHED_THRESHOLDS = {"low": 0.5, "normal": 0.8, "high": 1.0}
+ROUTE_PRIORITIES = {
+    ("POST", "/api/auth/login"): "low",
+    ("POST", "/api/auth/register"): "low",
+    ("GET", "/api/scrims"): "high",
+    ("GET", "/api/health"): "high",
+    ("GET", "/api/maps"): "high",
+}
+
+def _load_limit(name: str, scope: str, default: tuple) -> tuple:
+    override = os.environ.get(f"RATE_LIMIT_{name.upper()}_{scope.upper()}")
+    if not override:
+        return default
+    capacity, per = override.split("/")
+    return int(capacity), float(per)
+
+class TokenBucketStore:
+    """In-memory token buckets, LRU-bounded to RATE_LIMIT_MAX_BUCKETS keys"""
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, per: float) -> float:
+        """Consume one token. Returns 0 if allowed, otherwise seconds until a token is available."""
+        rate = capacity / per
+        now = time.monotonic()
+        with self.lock:
+            tokens, last = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / rate
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        return retry_after
+
+class MongoTokenBucketStore:
+    """Token buckets stored in MongoDB so every worker shares the same budget"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.collection.create_index("key", unique=True)
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def take(self, key: str, capacity: int, per: float) -> float:
+        rate = capacity / per
+        now = datetime.utcnow()
+        # Refill and consume atomically in a single pipeline update
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [elapsed, rate]}]}]}
+        update = [
+            {"$set": {"tokens": refilled, "updated_at": now, "expires_at": now + timedelta(seconds=per * 2)}},
+            {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+            {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+        ]
+        try:
+            doc = self.collection.find_one_and_update(
+                {"key": key}, update, upsert=True, return_document=pymongo.ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Another worker created the bucket first; it exists now, so update it
+            doc = self.collection.find_one_and_update(
+                {"key": key}, update, upsert=True, return_document=pymongo.ReturnDocument.AFTER
+            )
+        if doc["allowed"]:
+            return 0.0
+        return (1 - doc["tokens"]) / rate
+
+if RATE_LIMIT_BACKEND == "mongo":
+    bucket_store = MongoTokenBucketStore(rate_limits_collection)
+else:
+    bucket_store = TokenBucketStore(RATE_LIMIT_MAX_BUCKETS)
+
+# Rejection counters, keyed by "<reason>:<name>"
+rate_limit_counters: Dict[str, int] = {}
+inflight_requests = 0
+
+def _count_rejection(key: str):
+    rate_limit_counters[key] = rate_limit_counters.get(key, 0) + 1
+
+def _client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or peer not in TRUSTED_PROXIES:
+        return peer
+    # Walk back from the nearest hop; the first address not added by our own
+    # proxies is the client. Anything further left is client-controlled.
+    for hop in reversed([ip.strip() for ip in forwarded.split(",")]):
+        if hop and hop not in TRUSTED_PROXIES:
+            return hop
+    return peer
+
+def _token_subject(request: Request) -> Optional[str]:
+    """Read the user id from the bearer token without touching the database"""
+    auth = request.headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(auth[7:], SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+    return payload.get("sub")
+
+def rate_limit(name: str):
+    """Dependency enforcing the per-user, per-IP and global buckets configured for `name`"""
+    limits = {scope: _load_limit(name, scope, default) for scope, default in RATE_LIMITS[name].items()}
+
+    def check(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        keys = {"global": "global"}
+        keys["ip"] = _client_ip(request)
+        user_id = _token_subject(request)
+        if user_id:
+            keys["user"] = user_id
+        for scope, (capacity, per) in limits.items():
+            if scope not in keys:
+                continue
+            retry_after = bucket_store.take(f"{name}:{scope}:{keys[scope]}", capacity, per)
+            if retry_after > 0:
+                _count_rejection(f"rate_limited:{name}:{scope}")
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many requests, please slow down",
+                    headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+                )
+
+    return check
+
+@app.middleware("http")
+async def load_shedding(request: Request, call_next):
+    global inflight_requests
+    priority = ROUTE_PRIORITIES.get((request.method, request.url.path), "normal")
+    if inflight_requests >= MAX_INFLIGHT * SHED_THRESHOLDS[priority]:
+        _count_rejection(f"shed:{priority}")
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is busy, please retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+    inflight_requests += 1
+    try:
+        return await call_next(request)
+    finally:
+        inflight_requests -= 1
+
+# Middleware added last runs first, so CORS headers also reach shed 503s.
+# Retry-After is exposed so the browser lets the SPA read it.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["Retry-After"],
+)
+
+# Indexes
+SEARCH_RESULT_LIMIT = 50
+USERNAME_SUGGEST_LIMIT = 20
+USERNAME_SUGGEST_MIN_PREFIX = 2
+
+@app.on_event("startup")
+def ensure_indexes():
+    scrims_collection.create_index(
+        [("title", pymongo.TEXT), ("description", pymongo.TEXT), ("team_name", pymongo.TEXT)],
+        weights={"title": 10, "team_name": 5, "description": 1},
+        name="scrims_text"
+    )
+    users_collection.create_index("username_lower")
+    team_schedule_collection.create_index([("team_id", 1), ("start", 1)])
+    team_schedule_collection.create_index([("team_id", 1), ("end", 1)])
+    team_schedule_collection.create_index([("scrim_id", 1), ("team_id", 1)], unique=True)
+    scrims_collection.create_index("updated_at")
+    scrims_collection.create_index("created_at")
+    events_collection.create_index([("actor_id", 1), ("time", -1), ("event_id", -1)])
+    events_collection.create_index([("actor_id", 1), ("type", 1), ("time", -1), ("event_id", -1)])
+    events_collection.create_index([("type", 1), ("time", -1), ("event_id", -1)])
+    events_collection.create_index([("time", -1), ("event_id", -1)])
+    
+    # Backfill the normalized username for accounts created before it existed
+    for user in users_collection.find({"username_lower": {"$exists": False}}, {"user_id": 1, "username": 1}):
+        users_collection.update_one(
+            {"user_id": user["user_id"]},
+            {"$set": {"username_lower": user["username"].lower()}}
+        )
+    
+    # Seed the schedule from existing scrims the first time it is created
+    if team_schedule_collection.estimated_document_count() == 0:
+        for scrim in scrims_collection.find({"status": {"$ne": "cancelled"}}):
+            book_team_slot(scrim["team_id"], scrim, "host")
+            for application in scrim.get("applications", []):
+                if application["status"] == "accepted":
+                    book_team_slot(application["team_id"], scrim, "guest")
+    
+    # Slots booked before tiers were recorded on them
+    for slot in team_schedule_collection.find({"tier": {"$exists": False}}, {"scrim_id": 1}):
+        scrim = scrims_collection.find_one({"scrim_id": slot["scrim_id"]}, {"tier": 1})
+        if scrim:
+            team_schedule_collection.update_one({"_id": slot["_id"]}, {"$set": {"tier": scrim["tier"]}})
+
+# Analytics rollups
+ANALYTICS_ROLLUP_INTERVAL = int(os.environ.get("ANALYTICS_ROLLUP_INTERVAL", "300"))
+# Writes that stamp updated_at just before a run can land after it has read the
+# scrims, so each run re-scans this far behind the previous one
+ANALYTICS_ROLLUP_OVERLAP_SECONDS = int(os.environ.get("ANALYTICS_ROLLUP_OVERLAP_SECONDS", "60"))
+EXPORT_BATCH_SIZE = 500
+
+SCRIM_EXPORT_FIELDS = [
+    "scrim_id", "team_id", "team_name", "title", "tier", "status", "maps", "max_rounds",
+    "num_games", "max_participants", "scheduled_time", "created_at", "application_count"
+]
+APPLICATION_EXPORT_FIELDS = [
+    "scrim_id", "application_id", "team_id", "team_name", "status", "selected_maps",
+    "preferred_rounds", "preferred_games", "applied_at"
+]
+
+def run_analytics_rollup() -> dict:
+    """Refresh per-scrim stats for scrims changed since the last run, then regroup the summaries.
+
+    The per-scrim stage only reads changed scrims. The summary stage regroups the whole
+    analytics_scrim_stats collection, which holds one small document per scrim.
+    """
+    run_started = datetime.utcnow()
+    state = analytics_state_collection.find_one({"_id": "rollup"})
+    if state:
+        # Replacing per-scrim stats is idempotent, so re-scanning the overlap is safe
+        changed = {"updated_at": {"$gt": state["last_run"] - timedelta(seconds=ANALYTICS_ROLLUP_OVERLAP_SECONDS)}}
+    else:
+        changed = {}
+    processed = scrims_collection.count_documents(changed)
+    
+    # Per-scrim stats, replaced whenever the scrim changes
+    scrims_collection.aggregate([
+        {"$match": changed},
+        {"$set": {
+            "application_count": {"$size": {"$ifNull": ["$applications", []]}},
+            "accepted_count": {"$size": {"$filter": {
+                "input": {"$ifNull": ["$applications", []]},
+                "cond": {"$eq": ["$$this.status", "accepted"]}
+            }}}
+        }},
+        {"$project": {
+            "_id": "$scrim_id",
+            "team_id": 1,
+            "tier": 1,
+            "maps": 1,
+            "status": 1,
+            "scheduled_time": 1,
+            "hour": {"$hour": "$scheduled_time"},
+            "application_count": 1,
+            "accepted_count": 1,
+            # The hosting team fills one of the participant slots
+            "fill_rate": {"$min": [1, {"$divide": [
+                {"$add": ["$accepted_count", 1]},
+                {"$max": ["$max_participants", 1]}
+            ]}]},
+            "rolled_up_at": run_started
+        }},
+        {"$merge": {"into": "analytics_scrim_stats", "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ])
+    
+    group_totals = {
+        "scrims": {"$sum": 1},
+        "applications": {"$sum": "$application_count"},
+        "avg_applications": {"$avg": "$application_count"},
+        "avg_fill_rate": {"$avg": "$fill_rate"}
+    }
+    
+    # Summaries are regrouped in full from the compact per-scrim stats; with only
+    # 4 tiers and 11 maps almost every group is touched by any batch anyway
+    if processed:
+        analytics_scrim_stats_collection.aggregate([
+            {"$unwind": "$maps"},
+            {"$group": {"_id": {"map": "$maps", "tier": "$tier"}, **group_totals}},
+            {"$merge": {"into": "analytics_map_tier", "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+        analytics_scrim_stats_collection.aggregate([
+            {"$group": {"_id": "$tier", **group_totals}},
+            {"$merge": {"into": "analytics_tier", "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+        analytics_scrim_stats_collection.aggregate([
+            {"$group": {"_id": "$hour", **group_totals}},
+            {"$merge": {"into": "analytics_hourly", "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+    
+    analytics_state_collection.update_one(
+        {"_id": "rollup"},
+        {"$set": {"last_run": run_started, "processed": processed}},
+        upsert=True
+    )
+    return {"last_run": run_started, "processed": processed}
+
+async def analytics_rollup_loop():
+    while True:
+        try:
+            await asyncio.to_thread(run_analytics_rollup)
+        except Exception as e:
+            logging.exception(f"Analytics rollup failed: {e}")
+        await asyncio.sleep(ANALYTICS_ROLLUP_INTERVAL)
+
+@app.on_event("startup")
+async def start_analytics_rollup():
+    if ANALYTICS_ROLLUP_INTERVAL > 0:
+        asyncio.create_task(analytics_rollup_loop())
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return "|".join(str(v) for v in value)
+    return value
+
+def stream_export(cursor, fields: List[str], export_format: str):
+    """Yield rows from a cursor as NDJSON or CSV without holding the result set in memory"""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for doc in cursor:
+            writer.writerow([_export_value(doc.get(field)) for field in fields])
+            # Flush in chunks rather than once per row
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for doc in cursor:
+            yield json.dumps({field: doc.get(field) for field in fields}, default=_json_default) + "\n"
+
+def export_response(cursor, fields: List[str], export_format: str, name: str):
+    if export_format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Format must be ndjson or csv")
+    
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_export(cursor, fields, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'}
+    )
+
+# Audit events (write-behind)
+AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "1.0"))
+EVENTS_PAGE_LIMIT = 200
+
+audit_queue: Optional[asyncio.Queue] = None
+audit_flusher: Optional[asyncio.Task] = None
+audit_stats = {"queued": 0, "flushed": 0, "failed": 0}
+
+async def record_event(event_type: str, actor: dict, **details):
+    """Queue an audit event. Only blocks when the queue is full, pushing back on writers."""
+    event = {
+        "event_id": str(uuid.uuid4()),
+        "type": event_type,
+        "actor_id": actor["user_id"],
+        "actor_username": actor["username"],
+        "details": details,
+        "time": datetime.utcnow()
+    }
+    if audit_queue is None:
+        # Not running under the app lifecycle, write directly
+        events_collection.insert_one(event)
+        return
+    try:
+        audit_queue.put_nowait(event)
+    except asyncio.QueueFull:
+        await audit_queue.put(event)
+    audit_stats["queued"] += 1
+
+async def _flush_events(batch: List[dict]):
+    try:
+        await asyncio.to_thread(events_collection.insert_many, batch, ordered=False)
+        audit_stats["flushed"] += len(batch)
+    except Exception as e:
+        audit_stats["failed"] += len(batch)
+        logging.exception(f"Failed to write {len(batch)} audit events: {e}")
+
+async def audit_flush_loop():
+    """Flush queued events once AUDIT_BATCH_SIZE are waiting or AUDIT_FLUSH_INTERVAL has passed"""
+    loop = asyncio.get_running_loop()
+    while True:
+        event = await audit_queue.get()
+        if event is None:
+            return
+        batch = [event]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL
+        stopping = False
+        while len(batch) < AUDIT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(audit_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if event is None:
+                stopping = True
+                break
+            batch.append(event)
+        await _flush_events(batch)
+        if stopping:
+            return
+
+@app.on_event("startup")
+async def start_audit_flusher():
+    global audit_queue, audit_flusher
+    audit_queue = asyncio.Queue(maxsize=AUDIT_QUEUE_SIZE)
+    audit_flusher = asyncio.create_task(audit_flush_loop())
+
+@app.on_event("shutdown")
+async def stop_audit_flusher():
+    # The sentinel is queued behind pending events, so everything is flushed first
+    await audit_queue.put(None)
+    await audit_flusher
+
 # API Endpoints
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
-@app.post("/api/auth/register")
+@app.post("/api/auth/register", dependencies=[Depends(rate_limit("register"))])
 async def register(user_data: UserCreate):
     # Check if user already exists
     if users_collection.find_one({"email": user_data.email}):
@@ -207,6 +841,7 @@ async def register(user_data: UserCreate):
     user_doc = {
         "user_id": user_id,
         "username": user_data.username,
+        "username_lower": user_data.username.lower(),
         "email": user_data.email,
         "password_hash": hash_password(user_data.password),
         "valorant_username": user_data.valorant_username,
@@ -235,7 +870,7 @@ async def register(user_data: UserCreate):
         }
     }
 
-@app.post("/api/auth/login")
+@app.post("/api/auth/login", dependencies=[Depends(rate_limit("login"))])
 async def login(user_data: UserLogin):
     user = users_collection.find_one({"email": user_data.email})
     if not user or not verify_password(user_data.password, user["password_hash"]):
@@ -302,6 +937,8 @@ async def request_tier_upgrade(request: TierUpgradeRequest, current_user: dict =
     }
     
     tier_requests_collection.insert_one(request_doc)
+    await record_event("tier_upgrade_requested", current_user, request_id=request_doc["request_id"],
+                       requested_tier=request_doc["requested_tier"])
     return {"message": "Tier upgrade request submitted successfully"}
 
 @app.post("/api/teams/create")
@@ -362,6 +999,29 @@ async def get_my_team(current_user: dict = Depends(get_current_user)):
     
     return team
 
+@app.get("/api/users/search")
+async def suggest_usernames(prefix: str, limit: int = 10, current_user: dict = Depends(get_current_user)):
+    prefix = prefix.strip().lower()
+    if len(prefix) < USERNAME_SUGGEST_MIN_PREFIX:
+        return []
+    
+    limit = max(1, min(limit, USERNAME_SUGGEST_LIMIT))
+    # Range scan on the normalized username index instead of a regex
+    users = users_collection.find(
+        {"username_lower": {"$gte": prefix, "$lt": prefix + "\uffff"}},
+        {"_id": 0, "user_id": 1, "username": 1, "rank": 1, "team_id": 1}
+    ).sort("username_lower", 1).limit(limit)
+    
+    return [
+        {
+            "user_id": user["user_id"],
+            "username": user["username"],
+            "rank": user.get("rank"),
+            "has_team": bool(user.get("team_id"))
+        }
+        for user in users
+    ]
+
 @app.post("/api/scrims/create")
 async def create_scrim(scrim_data: ScrimCreate, current_user: dict = Depends(get_current_user)):
     if not current_user.get("team_id"):
@@ -374,6 +1034,9 @@ async def create_scrim(scrim_data: ScrimCreate, current_user: dict = Depends(get
     if team["owner_id"] != current_user["user_id"]:
         raise HTTPException(status_code=403, detail="Only team owners can create scrims")
     
+    if scrim_data.num_games < 1 or scrim_data.num_games > MAX_GAMES_PER_SCRIM:
+        raise HTTPException(status_code=400, detail=f"Number of games must be between 1 and {MAX_GAMES_PER_SCRIM}")
+    
     # Validate maps
     invalid_maps = [m for m in scrim_data.maps if m not in VALORANT_MAPS]
     if invalid_maps:
@@ -394,14 +1057,24 @@ async def create_scrim(scrim_data: ScrimCreate, current_user: dict = Depends(get
         "applications": [],
         "status": "open",
         "tier": team["tier"],
-        "created_at": datetime.utcnow()
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
     }
     
-    scrims_collection.insert_one(scrim_doc)
+    start, end = scrim_slot(scrim_data.scheduled_time, scrim_data.num_games)
+    async with team_schedule_lock(current_user["team_id"]):
+        conflict = find_schedule_conflict(current_user["team_id"], start, end)
+        if conflict:
+            raise HTTPException(status_code=409, detail=f"Your team is already booked for '{conflict['title']}' at that time")
+        
+        scrims_collection.insert_one(scrim_doc)
+        book_team_slot(current_user["team_id"], scrim_doc, "host")
+    
+    await record_event("scrim_created", current_user, scrim_id=scrim_id, team_id=current_user["team_id"])
     return {"message": "Scrim created successfully", "scrim_id": scrim_id}
 
 @app.get("/api/scrims")
-async def get_scrims(current_user: dict = Depends(get_current_user)):
+async def get_scrims(request: Request, current_user: dict = Depends(get_current_user)):
     # Get scrims that user can see based on tier
     query = {"status": "open"}
     
@@ -413,9 +1086,29 @@ async def get_scrims(current_user: dict = Depends(get_current_user)):
         if can_see_tier(current_user["tier"], scrim["tier"]):
             visible_scrims.append(serialize_doc(scrim))
     
-    return visible_scrims
+    return encode_list(request, visible_scrims)
 
-@app.post("/api/scrims/{scrim_id}/apply")
+@app.get("/api/scrims/search")
+async def search_scrims(q: str, limit: int = 20, current_user: dict = Depends(get_current_user)):
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query is required")
+    
+    limit = max(1, min(limit, SEARCH_RESULT_LIMIT))
+    query = {
+        "$text": {"$search": q},
+        "status": "open",
+        "tier": {"$in": visible_tiers(current_user["tier"])}
+    }
+    
+    scrims = scrims_collection.find(
+        query,
+        {"score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    
+    return serialize_doc(list(scrims))
+
+@app.post("/api/scrims/{scrim_id}/apply", dependencies=[Depends(rate_limit("apply"))])
 async def apply_to_scrim(scrim_id: str, application: ScrimApplication, current_user: dict = Depends(get_current_user)):
     if not current_user.get("team_id"):
         raise HTTPException(status_code=400, detail="You must be in a team to apply to scrims")
@@ -446,20 +1139,106 @@ async def apply_to_scrim(scrim_id: str, application: ScrimApplication, current_u
         "applied_at": datetime.utcnow()
     }
     
+    start, end = scrim_slot(scrim["scheduled_time"], scrim["num_games"])
+    async with team_schedule_lock(current_user["team_id"]):
+        conflict = find_schedule_conflict(current_user["team_id"], start, end)
+        if conflict:
+            raise HTTPException(status_code=409, detail=f"Your team is already booked for '{conflict['title']}' at that time")
+        
+        scrims_collection.update_one(
+            {"scrim_id": scrim_id},
+            {"$push": {"applications": application_doc}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+    
+    await record_event("scrim_application", current_user, scrim_id=scrim_id,
+                       application_id=application_doc["application_id"], team_id=current_user["team_id"])
+    return {"message": "Application submitted successfully"}
+
+@app.post("/api/scrims/{scrim_id}/applications/{application_id}/accept")
+async def accept_application(scrim_id: str, application_id: str, current_user: dict = Depends(get_current_user)):
+    scrim = scrims_collection.find_one({"scrim_id": scrim_id})
+    if not scrim:
+        raise HTTPException(status_code=404, detail="Scrim not found")
+    
+    if scrim["team_id"] != current_user.get("team_id"):
+        raise HTTPException(status_code=403, detail="Only the hosting team can accept applications")
+    
+    application = next((a for a in scrim["applications"] if a["application_id"] == application_id), None)
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
+    
+    if application["status"] != "pending":
+        raise HTTPException(status_code=400, detail="Application has already been processed")
+    
+    if scrim["status"] != "open":
+        raise HTTPException(status_code=400, detail="Scrim is no longer open")
+    
+    start, end = scrim_slot(scrim["scheduled_time"], scrim["num_games"])
+    # The hosting team counts as one participant
+    accepted_count = {"$size": {"$filter": {
+        "input": "$applications",
+        "cond": {"$eq": ["$$this.status", "accepted"]}
+    }}}
+    guest_slots = {"$subtract": ["$max_participants", 1]}
+    
+    async with team_schedule_lock(application["team_id"]):
+        conflict = find_schedule_conflict(application["team_id"], start, end, exclude_scrim_id=scrim_id)
+        if conflict:
+            raise HTTPException(status_code=409, detail=f"{application['team_name']} is already booked for '{conflict['title']}' at that time")
+        
+        try:
+            book_team_slot(application["team_id"], scrim, "guest")
+        except DuplicateKeyError:
+            raise HTTPException(status_code=409, detail="Application has already been accepted")
+        
+        # Only accept if the application is still pending and a guest slot is still free
+        result = scrims_collection.update_one(
+            {
+                "scrim_id": scrim_id,
+                "status": "open",
+                "applications": {"$elemMatch": {"application_id": application_id, "status": "pending"}},
+                "$expr": {"$lt": [accepted_count, guest_slots]}
+            },
+            {"$set": {
+                "applications.$.status": "accepted",
+                "applications.$.processed_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            }}
+        )
+        if result.matched_count == 0:
+            team_schedule_collection.delete_one({"scrim_id": scrim_id, "team_id": application["team_id"]})
+            raise HTTPException(status_code=409, detail="Scrim or application changed, please reload")
+    
     scrims_collection.update_one(
-        {"scrim_id": scrim_id},
-        {"$push": {"applications": application_doc}}
+        {"scrim_id": scrim_id, "status": "open", "$expr": {"$gte": [accepted_count, guest_slots]}},
+        {"$set": {"status": "filled", "updated_at": datetime.utcnow()}}
     )
     
-    return {"message": "Application submitted successfully"}
+    await record_event("application_accepted", current_user, scrim_id=scrim_id,
+                       application_id=application_id, team_id=application["team_id"])
+    return {"message": "Application accepted"}
+
+@app.get("/api/teams/{team_id}/schedule")
+async def get_team_schedule(team_id: str, start: Optional[datetime] = None, limit: int = 50,
+                            current_user: dict = Depends(get_current_user)):
+    limit = max(1, min(limit, SCHEDULE_PAGE_LIMIT))
+    # Slots still in progress are included, so match on the end of the slot
+    query = {"team_id": team_id, "end": {"$gt": start or datetime.utcnow()}}
+    # Outsiders only see slots for scrims in tiers they could see on the board
+    if current_user.get("team_id") != team_id and not current_user.get("is_admin"):
+        query["tier"] = {"$in": visible_tiers(current_user["tier"])}
+    
+    slots = team_schedule_collection.find(query, {"_id": 0}).sort("end", 1).limit(limit)
+    
+    return list(slots)
 
 @app.get("/api/admin/tier-requests")
-async def get_tier_requests(current_user: dict = Depends(get_current_user)):
+async def get_tier_requests(request: Request, current_user: dict = Depends(get_current_user)):
     if not current_user.get("is_admin"):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     requests = list(tier_requests_collection.find({"status": "pending"}))
-    return serialize_doc(requests)
+    return encode_list(request, serialize_doc(requests))
 
 @app.post("/api/admin/tier-requests/{request_id}/approve")
 async def approve_tier_request(request_id: str, current_user: dict = Depends(get_current_user)):
@@ -482,6 +1261,8 @@ async def approve_tier_request(request_id: str, current_user: dict = Depends(get
         {"$set": {"status": "approved", "processed_at": datetime.utcnow()}}
     )
     
+    await record_event("tier_request_approved", current_user, request_id=request_id,
+                       user_id=request_doc["user_id"], tier=request_doc["requested_tier"])
     return {"message": "Tier request approved"}
 
 @app.post("/api/admin/tier-requests/{request_id}/reject")
@@ -494,8 +1275,119 @@ async def reject_tier_request(request_id: str, current_user: dict = Depends(get_
         {"$set": {"status": "rejected", "processed_at": datetime.utcnow()}}
     )
     
+    await record_event("tier_request_rejected", current_user, request_id=request_id)
     return {"message": "Tier request rejected"}
 
+@app.get("/api/admin/events")
+async def get_events(actor_id: Optional[str] = None, type: Optional[str] = None,
+                     before: Optional[datetime] = None, before_id: Optional[str] = None,
+                     limit: int = 50, current_user: dict = Depends(get_current_user)):
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    limit = max(1, min(limit, EVENTS_PAGE_LIMIT))
+    query = {}
+    if actor_id:
+        query["actor_id"] = actor_id
+    if type:
+        query["type"] = type
+    if before and before_id:
+        # Events flushed in one batch often share a timestamp, so break ties on event_id
+        query["$or"] = [
+            {"time": {"$lt": before}},
+            {"time": before, "event_id": {"$lt": before_id}}
+        ]
+    elif before:
+        query["time"] = {"$lt": before}
+    
+    events = list(
+        events_collection.find(query, {"_id": 0}).sort([("time", -1), ("event_id", -1)]).limit(limit)
+    )
+    last = events[-1] if len(events) == limit else None
+    return {
+        "events": events,
+        # Pass back as `before` and `before_id` to fetch the next page
+        "next_before": last["time"] if last else None,
+        "next_before_id": last["event_id"] if last else None
+    }
+
+@app.get("/api/admin/events/stats")
+async def get_event_stats(current_user: dict = Depends(get_current_user)):
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {
+        **audit_stats,
+        "pending": audit_queue.qsize() if audit_queue is not None else 0,
+        "capacity": AUDIT_QUEUE_SIZE
+    }
+
+@app.get("/api/admin/analytics")
+async def get_analytics(current_user: dict = Depends(get_current_user)):
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    state = analytics_state_collection.find_one({"_id": "rollup"}) or {}
+    return {
+        "last_run": state.get("last_run"),
+        "by_tier": list(analytics_tier_collection.find().sort("_id", 1)),
+        "by_map_tier": list(analytics_map_tier_collection.find().sort("scrims", -1)),
+        "by_hour": list(analytics_hourly_collection.find().sort("_id", 1))
+    }
+
+@app.post("/api/admin/analytics/rollup")
+async def trigger_analytics_rollup(current_user: dict = Depends(get_current_user)):
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return await asyncio.to_thread(run_analytics_rollup)
+
+@app.get("/api/admin/export/scrims")
+async def export_scrims(format: str = "ndjson", since: Optional[datetime] = None,
+                        current_user: dict = Depends(get_current_user)):
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    query = {"created_at": {"$gte": since}} if since else {}
+    projection = {field: 1 for field in SCRIM_EXPORT_FIELDS if field != "application_count"}
+    cursor = scrims_collection.aggregate([
+        {"$match": query},
+        {"$sort": {"created_at": 1}},
+        {"$project": {**projection, "application_count": {"$size": {"$ifNull": ["$applications", []]}}}}
+    ], batchSize=EXPORT_BATCH_SIZE)
+    
+    return export_response(cursor, SCRIM_EXPORT_FIELDS, format, "scrims")
+
+@app.get("/api/admin/export/applications")
+async def export_applications(format: str = "ndjson", since: Optional[datetime] = None,
+                              current_user: dict = Depends(get_current_user)):
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    query = {"created_at": {"$gte": since}} if since else {}
+    cursor = scrims_collection.aggregate([
+        {"$match": query},
+        {"$sort": {"created_at": 1}},
+        {"$project": {"scrim_id": 1, "applications": 1}},
+        {"$unwind": "$applications"},
+        {"$replaceWith": {"$mergeObjects": [{"scrim_id": "$scrim_id"}, "$applications"]}}
+    ], batchSize=EXPORT_BATCH_SIZE)
+    
+    return export_response(cursor, APPLICATION_EXPORT_FIELDS, format, "applications")
+
+@app.get("/api/admin/rate-limits")
+async def get_rate_limit_stats(current_user: dict = Depends(get_current_user)):
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {
+        "enabled": RATE_LIMIT_ENABLED,
+        "backend": RATE_LIMIT_BACKEND,
+        "inflight": inflight_requests,
+        "max_inflight": MAX_INFLIGHT,
+        "rejections": dict(rate_limit_counters)
+    }
+
 @app.get("/api/maps")
 async def get_maps():
     return {"maps": VALORANT_MAPS}
@@ -1,6 +1,8 @@
+import os
 import requests
 import sys
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any
 
@@ -60,6 +62,19 @@ class ValScrimsAPITester:
         except Exception as e:
             return False, {"error": str(e)}, 0
 
+    def raw_request(self, method: str, endpoint: str, headers: Dict[str, str] = None, data: Dict[Any, Any] = None):
+        """Make HTTP request with extra headers and return the raw response, or None on error"""
+        request_headers = {'Content-Type': 'application/json'}
+        if self.token:
+            request_headers['Authorization'] = f'Bearer {self.token}'
+        request_headers.update(headers or {})
+
+        try:
+            return requests.request(method, f"{self.base_url}/{endpoint}", json=data, headers=request_headers, timeout=10)
+        except Exception as e:
+            print(f"Request to {endpoint} failed: {e}")
+            return None
+
     def test_health_check(self):
         """Test health endpoint"""
         success, response, status = self.make_request('GET', 'api/health')
@@ -203,6 +218,46 @@ class ValScrimsAPITester:
             self.log_test("Create Scrim", False, f"Status: {status}, Response: {response}")
             return False
 
+    def test_double_booking_rejected(self):
+        """Test that a team cannot host two overlapping scrims"""
+        if not self.scrim_id:
+            self.log_test("Double Booking Rejected", False, "No scrim created")
+            return False
+
+        scrim_data = {
+            "title": "Overlapping Scrim",
+            "description": "Should clash with the first test scrim",
+            "maps": ["Haven"],
+            "max_rounds": 13,
+            "num_games": 1,
+            "scheduled_time": (datetime.utcnow() + timedelta(hours=2, minutes=30)).isoformat(),
+            "max_participants": 2
+        }
+
+        success, response, status = self.make_request('POST', 'api/scrims/create', scrim_data, 409)
+        
+        if success:
+            self.log_test("Double Booking Rejected", True)
+            return True
+        else:
+            self.log_test("Double Booking Rejected", False, f"Status: {status}, Response: {response}")
+            return False
+
+    def test_get_team_schedule(self):
+        """Test getting the team's upcoming calendar"""
+        if not self.team_id:
+            self.log_test("Get Team Schedule", False, "No team created")
+            return False
+
+        success, response, status = self.make_request('GET', f'api/teams/{self.team_id}/schedule')
+        
+        if success and any(slot['scrim_id'] == self.scrim_id for slot in response):
+            self.log_test("Get Team Schedule", True)
+            return True
+        else:
+            self.log_test("Get Team Schedule", False, f"Status: {status}, Response: {response}")
+            return False
+
     def test_get_scrims(self):
         """Test getting available scrims"""
         success, response, status = self.make_request('GET', 'api/scrims')
@@ -214,6 +269,121 @@ class ValScrimsAPITester:
             self.log_test("Get Scrims", False, f"Status: {status}, Response: {response}")
             return False
 
+    def test_scrims_columnar_encoding(self):
+        """Test that /api/scrims honours the columnar Accept type"""
+        response = self.raw_request('GET', 'api/scrims', {'Accept': 'application/vnd.scrims.columnar+json, application/json;q=0.9'})
+        if response is None:
+            self.log_test("Scrims Columnar Encoding", False, "Request failed")
+            return False
+
+        content_type = response.headers.get('Content-Type', '')
+        vary = response.headers.get('Vary', '')
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        if (response.status_code == 200 and 'application/vnd.scrims.columnar+json' in content_type
+                and 'accept' in vary.lower() and isinstance(body, dict)
+                and isinstance(body.get('length'), int) and isinstance(body.get('columns'), dict)
+                and all(len(column) == body['length'] for column in body['columns'].values())):
+            self.log_test("Scrims Columnar Encoding", True)
+            return True
+        else:
+            self.log_test("Scrims Columnar Encoding", False, f"Status: {response.status_code}, Content-Type: {content_type}, Vary: {vary}")
+            return False
+
+    def test_scrims_msgpack_encoding(self):
+        """Test that /api/scrims serves MessagePack when asked, or falls back to JSON without it"""
+        response = self.raw_request('GET', 'api/scrims', {'Accept': 'application/msgpack'})
+        if response is None or response.status_code != 200:
+            self.log_test("Scrims MessagePack Encoding", False, f"Response: {response}")
+            return False
+
+        content_type = response.headers.get('Content-Type', '')
+        if 'application/msgpack' in content_type:
+            try:
+                import msgpack
+            except ImportError:
+                self.log_test("Scrims MessagePack Encoding", True, "msgpack not installed locally, body not decoded")
+                return True
+            success = isinstance(msgpack.unpackb(response.content), list)
+        else:
+            # Server without msgpack installed falls back to plain JSON
+            success = 'application/json' in content_type and isinstance(response.json(), list)
+
+        if success and 'accept' in response.headers.get('Vary', '').lower():
+            self.log_test("Scrims MessagePack Encoding", True)
+            return True
+        else:
+            self.log_test("Scrims MessagePack Encoding", False, f"Content-Type: {content_type}, Headers: {dict(response.headers)}")
+            return False
+
+    def test_scrims_default_json(self):
+        """Test that a wildcard Accept and q=0 opt-outs still get plain JSON"""
+        results = []
+        for accept in ('*/*', 'application/msgpack;q=0, application/vnd.scrims.columnar+json;q=0, */*;q=0.1'):
+            response = self.raw_request('GET', 'api/scrims', {'Accept': accept})
+            results.append(
+                response is not None and response.status_code == 200
+                and response.headers.get('Content-Type', '').startswith('application/json')
+                and isinstance(response.json(), list)
+            )
+
+        if all(results):
+            self.log_test("Scrims Default JSON", True)
+            return True
+        else:
+            self.log_test("Scrims Default JSON", False, f"Results: {results}")
+            return False
+
+    def test_scrims_compression(self):
+        """Test that large list responses are compressed"""
+        response = self.raw_request('GET', 'api/scrims', {'Accept': 'application/json', 'Accept-Encoding': 'br, gzip'})
+        if response is None or response.status_code != 200:
+            self.log_test("Scrims Compression", False, f"Response: {response}")
+            return False
+
+        encoding = response.headers.get('Content-Encoding', '')
+        # requests decodes the body, so this is the uncompressed size
+        if len(response.content) < 1024:
+            self.log_test("Scrims Compression", True, "Board below the compression threshold, nothing to check")
+            return True
+
+        if encoding in ('br', 'gzip'):
+            self.log_test("Scrims Compression", True)
+            return True
+        else:
+            self.log_test("Scrims Compression", False, f"Content-Encoding: {encoding!r}, Size: {len(response.content)}")
+            return False
+
+    def test_search_scrims(self):
+        """Test full-text scrim search"""
+        success, response, status = self.make_request('GET', 'api/scrims/search?q=Test%20Scrim')
+        
+        if success and isinstance(response, list):
+            self.log_test("Search Scrims", True)
+            return True
+        else:
+            self.log_test("Search Scrims", False, f"Status: {status}, Response: {response}")
+            return False
+
+    def test_suggest_usernames(self):
+        """Test username prefix typeahead"""
+        if not self.user_data:
+            self.log_test("Suggest Usernames", False, "No user data available")
+            return False
+
+        prefix = self.user_data['username'][:6].upper()
+        success, response, status = self.make_request('GET', f'api/users/search?prefix={prefix}')
+        
+        if success and any(u['username'] == self.user_data['username'] for u in response):
+            self.log_test("Suggest Usernames", True)
+            return True
+        else:
+            self.log_test("Suggest Usernames", False, f"Status: {status}, Response: {response}")
+            return False
+
     def test_get_maps(self):
         """Test getting available maps"""
         success, response, status = self.make_request('GET', 'api/maps')
@@ -236,6 +406,104 @@ class ValScrimsAPITester:
             self.log_test("Get Ranks", False, f"Status: {status}, Response: {response}")
             return False
 
+    def test_rate_limit_stats_requires_admin(self):
+        """Test that rate limit counters are admin-only"""
+        success, response, status = self.make_request('GET', 'api/admin/rate-limits', expected_status=403)
+        
+        if success:
+            self.log_test("Rate Limit Stats Admin Only", True)
+            return True
+        else:
+            self.log_test("Rate Limit Stats Admin Only", False, f"Status: {status}, Response: {response}")
+            return False
+
+    def test_analytics_requires_admin(self):
+        """Test that analytics, exports and the audit log are admin-only"""
+        endpoints = ['api/admin/analytics', 'api/admin/export/scrims?format=csv', 'api/admin/events']
+        results = [self.make_request('GET', endpoint, expected_status=403) for endpoint in endpoints]
+        
+        if all(success for success, _, _ in results):
+            self.log_test("Analytics Admin Only", True)
+            return True
+        else:
+            self.log_test("Analytics Admin Only", False, f"Statuses: {[status for _, _, status in results]}")
+            return False
+
+    def test_rate_limit_response_headers(self):
+        """Test that a rate-limited login is readable cross-origin and carries Retry-After"""
+        origin = "https://example.com"
+        login_data = {"email": "rate-limit-probe@example.com", "password": "wrong-password"}
+
+        # The per-IP login bucket allows 10 attempts a minute by default
+        response = None
+        for _ in range(30):
+            response = self.raw_request('POST', 'api/auth/login', {'Origin': origin}, login_data)
+            if response is None or response.status_code in (429, 503):
+                break
+
+        if response is None or response.status_code not in (429, 503):
+            status = response.status_code if response is not None else 0
+            self.log_test("Rate Limit Response Headers", False, f"Never rate limited, last status: {status}")
+            return False
+
+        cors = response.headers.get('Access-Control-Allow-Origin')
+        if response.headers.get('Retry-After') and cors in ('*', origin):
+            self.log_test("Rate Limit Response Headers", True)
+            return True
+        else:
+            self.log_test("Rate Limit Response Headers", False, f"Status: {response.status_code}, Headers: {dict(response.headers)}")
+            return False
+
+    def test_scrim_created_event(self):
+        """Test that creating a scrim writes an audit event that can be paged back"""
+        admin_email = os.environ.get("ADMIN_EMAIL")
+        admin_password = os.environ.get("ADMIN_PASSWORD")
+        if not admin_email or not admin_password:
+            self.log_test("Scrim Created Event (Manual Test Required)", True, "Set ADMIN_EMAIL and ADMIN_PASSWORD to run")
+            return True
+
+        if not self.scrim_id or not self.user_data:
+            self.log_test("Scrim Created Event", False, "No scrim created")
+            return False
+
+        user_token = self.token
+        self.token = None
+        success, response, status = self.make_request('POST', 'api/auth/login', {"email": admin_email, "password": admin_password})
+        if not success:
+            self.token = user_token
+            self.log_test("Scrim Created Event", False, f"Admin login failed: {status}")
+            return False
+        self.token = response['access_token']
+
+        # Events are written behind the request, give the flusher a moment
+        time.sleep(2)
+
+        # Walk one event per page to exercise the (time, event_id) cursor
+        endpoint = f"api/admin/events?actor_id={self.user_data['user_id']}&limit=1"
+        seen = []
+        found = False
+        cursor = ""
+        for _ in range(10):
+            success, response, status = self.make_request('GET', endpoint + cursor)
+            if not success:
+                break
+            seen.extend(event['event_id'] for event in response['events'])
+            found = found or any(
+                event['type'] == 'scrim_created' and event['details'].get('scrim_id') == self.scrim_id
+                for event in response['events']
+            )
+            if found or not response['next_before']:
+                break
+            cursor = f"&before={response['next_before']}&before_id={response['next_before_id']}"
+
+        self.token = user_token
+        if found and len(seen) == len(set(seen)):
+            self.log_test("Scrim Created Event", True)
+            return True
+        else:
+            self.log_test("Scrim Created Event", False, f"Status: {status}, Found: {found}, Events seen: {seen}")
+            return False
+
     def test_team_creation_restriction(self):
         """Test that tier_1/tier_2 users cannot create teams"""
         # This test would require admin privileges to change user tier
@@ -266,14 +534,30 @@ class ValScrimsAPITester:
         self.test_create_team()
         self.test_get_my_team()
         self.test_create_scrim()
+        self.test_double_booking_rejected()
+        self.test_get_team_schedule()
         self.test_get_scrims()
+        self.test_scrims_columnar_encoding()
+        self.test_scrims_msgpack_encoding()
+        self.test_scrims_default_json()
+        self.test_scrims_compression()
+        self.test_search_scrims()
+        self.test_suggest_usernames()
         
         # Utility endpoints
         self.test_get_maps()
         self.test_get_ranks()
         
+        # Admission control
+        self.test_rate_limit_stats_requires_admin()
+        self.test_analytics_requires_admin()
+        self.test_scrim_created_event()
+        
         # Restriction tests
         self.test_team_creation_restriction()
+        
+        # Exhausts this client's login bucket, so it runs last
+        self.test_rate_limit_response_headers()
 
         # Print summary
         print("\n" + "=" * 60)
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { BrowserRouter as Router, Routes, Route, Navigate } from 'react-router-dom';
 import axios from 'axios';
 import './App.css';
+import { clearQueryCache } from './lib/api';
 
 // Components
 import Header from './components/Header';
@@ -57,6 +58,7 @@ function App() {
       
       const { access_token, user: userData } = response.data;
       localStorage.setItem('token', access_token);
+      clearQueryCache();
       setUser(userData);
       return { success: true };
     } catch (error) {
@@ -72,6 +74,7 @@ function App() {
       const response = await axios.post(`${API_BASE_URL}/api/auth/register`, userData);
       const { access_token, user: newUser } = response.data;
       localStorage.setItem('token', access_token);
+      clearQueryCache();
       setUser(newUser);
       return { success: true };
     } catch (error) {
@@ -84,6 +87,7 @@ function App() {
 
   const logout = () => {
     localStorage.removeItem('token');
+    clearQueryCache();
     setUser(null);
   };
 
@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { getList, invalidateQueries } from '../lib/api';
+import { useQuery, STALE_TIMES } from '../hooks/use-query';
 import { 
   Shield, 
   Users, 
@@ -15,25 +17,28 @@ import {
 const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
 
 const AdminDashboard = ({ user }) => {
-  const [tierRequests, setTierRequests] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const { data, error: fetchError, loading, refetch } = useQuery(
+    '/api/admin/tier-requests',
+    () => getList('/api/admin/tier-requests'),
+    { staleTime: STALE_TIMES.short, enabled: user.is_admin }
+  );
+  const tierRequests = data || [];
   const [processing, setProcessing] = useState({});
   const [error, setError] = useState('');
 
   useEffect(() => {
-    fetchTierRequests();
-  }, []);
+    if (fetchError) {
+      setError('Failed to load tier requests');
+    }
+  }, [fetchError]);
 
   const fetchTierRequests = async () => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/api/admin/tier-requests`);
-      setTierRequests(response.data);
+      await refetch();
       setError('');
     } catch (err) {
       setError('Failed to load tier requests');
       console.error('Error fetching tier requests:', err);
-    } finally {
-      setLoading(false);
     }
   };
 
@@ -42,7 +47,7 @@ const AdminDashboard = ({ user }) => {
     
     try {
       await axios.post(`${API_BASE_URL}/api/admin/tier-requests/${requestId}/approve`);
-      await fetchTierRequests();
+      await invalidateQueries('/api/admin/tier-requests');
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to approve request');
     }
@@ -59,7 +64,7 @@ const AdminDashboard = ({ user }) => {
     
     try {
       await axios.post(`${API_BASE_URL}/api/admin/tier-requests/${requestId}/reject`);
-      await fetchTierRequests();
+      await invalidateQueries('/api/admin/tier-requests');
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to reject request');
     }
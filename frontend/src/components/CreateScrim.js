@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { getJSON, invalidateQueries } from '../lib/api';
+import { useQuery, STALE_TIMES } from '../hooks/use-query';
 import { 
   Target, 
   Calendar, 
@@ -18,7 +20,11 @@ const CreateScrim = ({ user }) => {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
-  const [maps, setMaps] = useState([]);
+  // The map pool is constant, so fetch it once per session
+  const { data: mapsData } = useQuery('/api/maps', () => getJSON('/api/maps'), {
+    staleTime: STALE_TIMES.forever
+  });
+  const maps = mapsData ? mapsData.maps : [];
   
   const [formData, setFormData] = useState({
     title: '',
@@ -37,18 +43,6 @@ const CreateScrim = ({ user }) => {
       return;
     }
 
-    // Fetch available maps
-    const fetchMaps = async () => {
-      try {
-        const response = await axios.get(`${API_BASE_URL}/api/maps`);
-        setMaps(response.data.maps);
-      } catch (err) {
-        console.error('Failed to fetch maps:', err);
-      }
-    };
-
-    fetchMaps();
-
     // Set default scheduled time to 1 hour from now
     const now = new Date();
     now.setHours(now.getHours() + 1);
@@ -83,6 +77,7 @@ const CreateScrim = ({ user }) => {
         scheduled_time: new Date(formData.scheduled_time).toISOString()
       });
       
+      invalidateQueries('/api/scrims', '/api/teams/');
       navigate('/scrims');
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to create scrim');
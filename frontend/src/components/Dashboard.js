@@ -1,6 +1,7 @@
-import React, { useState, useEffect } from 'react';
+import React from 'react';
 import { Link } from 'react-router-dom';
-import axios from 'axios';
+import { getJSON, getList } from '../lib/api';
+import { useQuery } from '../hooks/use-query';
 import { 
   Target, 
   Users, 
@@ -13,50 +14,21 @@ import {
   Star
 } from 'lucide-react';
 
-const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
-
 const Dashboard = ({ user }) => {
-  const [stats, setStats] = useState({
-    totalScrims: 0,
-    activeScrims: 0,
-    teamMembers: user.team ? 1 : 0
+  // Login returns team_id, the profile endpoint returns a nested team instead
+  const teamId = user.team_id || user.team?.team_id;
+  const { data: scrimsData, loading } = useQuery('/api/scrims', () => getList('/api/scrims'));
+  const { data: team } = useQuery('/api/teams/my-team', () => getJSON('/api/teams/my-team'), {
+    enabled: Boolean(teamId)
   });
-  const [recentScrims, setRecentScrims] = useState([]);
-  const [loading, setLoading] = useState(true);
-
-  useEffect(() => {
-    const fetchDashboardData = async () => {
-      try {
-        const scrimsResponse = await axios.get(`${API_BASE_URL}/api/scrims`);
-        const scrims = scrimsResponse.data;
-        
-        setRecentScrims(scrims.slice(0, 5));
-        setStats(prev => ({
-          ...prev,
-          totalScrims: scrims.length,
-          activeScrims: scrims.filter(s => s.status === 'open').length
-        }));
-        
-        if (user.team_id) {
-          try {
-            const teamResponse = await axios.get(`${API_BASE_URL}/api/teams/my-team`);
-            setStats(prev => ({
-              ...prev,
-              teamMembers: teamResponse.data.members.length
-            }));
-          } catch (error) {
-            console.error('Failed to fetch team data:', error);
-          }
-        }
-      } catch (error) {
-        console.error('Failed to fetch dashboard data:', error);
-      } finally {
-        setLoading(false);
-      }
-    };
 
-    fetchDashboardData();
-  }, [user.team_id]);
+  const scrims = scrimsData || [];
+  const recentScrims = scrims.slice(0, 5);
+  const stats = {
+    totalScrims: scrims.length,
+    activeScrims: scrims.filter(s => s.status === 'open').length,
+    teamMembers: team ? team.members.length : (user.team ? 1 : 0)
+  };
 
   const quickActions = [
     {
@@ -67,8 +39,8 @@ const Dashboard = ({ user }) => {
       color: 'from-purple-500 to-pink-500'
     },
     {
-      title: user.team_id ? 'Manage Team' : 'Create Team',
-      description: user.team_id ? 'View team members' : 'Start your own team',
+      title: teamId ? 'Manage Team' : 'Create Team',
+      description: teamId ? 'View team members' : 'Start your own team',
       href: '/team',
       icon: Users,
       color: 'from-blue-500 to-cyan-500'
@@ -79,7 +51,7 @@ const Dashboard = ({ user }) => {
       href: '/create-scrim',
       icon: Plus,
       color: 'from-green-500 to-emerald-500',
-      disabled: !user.team_id
+      disabled: !teamId
     }
   ];
 
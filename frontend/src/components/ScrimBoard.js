@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { getList, invalidateQueries } from '../lib/api';
+import { useQuery } from '../hooks/use-query';
 import { 
   Target, 
   Clock, 
@@ -15,10 +17,10 @@ import {
 const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
 
 const ScrimBoard = ({ user }) => {
-  const [scrims, setScrims] = useState([]);
+  const { data, error: fetchError, loading, refetch } = useQuery('/api/scrims', () => getList('/api/scrims'));
+  const scrims = data || [];
+  const error = fetchError ? 'Failed to load scrims' : '';
   const [filteredScrims, setFilteredScrims] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState('');
   const [refreshing, setRefreshing] = useState(false);
 
   // Filters
@@ -32,30 +34,17 @@ const ScrimBoard = ({ user }) => {
 
   const [showFilters, setShowFilters] = useState(false);
 
-  useEffect(() => {
-    fetchScrims();
-  }, []);
-
   useEffect(() => {
     applyFilters();
-  }, [scrims, filters]);
+  }, [data, filters]);
 
-  const fetchScrims = async () => {
+  const handleRefresh = async () => {
+    setRefreshing(true);
     try {
-      const response = await axios.get(`${API_BASE_URL}/api/scrims`);
-      setScrims(response.data);
-      setError('');
+      await refetch();
     } catch (err) {
-      setError('Failed to load scrims');
       console.error('Error fetching scrims:', err);
-    } finally {
-      setLoading(false);
     }
-  };
-
-  const handleRefresh = async () => {
-    setRefreshing(true);
-    await fetchScrims();
     setRefreshing(false);
   };
 
@@ -155,7 +144,7 @@ const ScrimBoard = ({ user }) => {
       });
       
       alert('Applied to scrim successfully!');
-      await fetchScrims();
+      invalidateQueries('/api/scrims', '/api/teams/');
     } catch (err) {
       alert(err.response?.data?.detail || 'Failed to apply to scrim');
     }
@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { fetchQuery, getJSON, invalidateQueries } from '../lib/api';
+import { useQuery } from '../hooks/use-query';
 import { 
   Users, 
   Plus, 
@@ -14,8 +16,14 @@ import {
 const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
 
 const TeamManagement = ({ user, setUser }) => {
-  const [team, setTeam] = useState(null);
-  const [loading, setLoading] = useState(true);
+  // Login returns team_id, the profile endpoint returns a nested team instead
+  const teamId = user.team_id || user.team?.team_id;
+  const { data: teamData, error: fetchError, loading } = useQuery(
+    '/api/teams/my-team',
+    () => getJSON('/api/teams/my-team'),
+    { enabled: Boolean(teamId) }
+  );
+  const team = teamId ? teamData : null;
   const [showCreateForm, setShowCreateForm] = useState(false);
   const [createLoading, setCreateLoading] = useState(false);
   const [error, setError] = useState('');
@@ -27,21 +35,11 @@ const TeamManagement = ({ user, setUser }) => {
   });
 
   useEffect(() => {
-    const fetchTeamData = async () => {
-      if (user.team_id) {
-        try {
-          const response = await axios.get(`${API_BASE_URL}/api/teams/my-team`);
-          setTeam(response.data);
-        } catch (err) {
-          console.error('Failed to fetch team:', err);
-          setError('Failed to load team data');
-        }
-      }
-      setLoading(false);
-    };
-
-    fetchTeamData();
-  }, [user.team_id]);
+    if (fetchError && teamId) {
+      console.error('Failed to fetch team:', fetchError);
+      setError('Failed to load team data');
+    }
+  }, [fetchError, teamId]);
 
   const handleCreateTeam = async (e) => {
     e.preventDefault();
@@ -51,14 +49,14 @@ const TeamManagement = ({ user, setUser }) => {
     try {
       await axios.post(`${API_BASE_URL}/api/teams/create`, createForm);
       
+      // Load the new team into the cache before the page switches over to it
+      invalidateQueries('/api/teams/');
+      await fetchQuery('/api/teams/my-team', () => getJSON('/api/teams/my-team'));
+      
       // Refresh user data
       const profileResponse = await axios.get(`${API_BASE_URL}/api/user/profile`);
       setUser(profileResponse.data);
       
-      // Fetch new team data
-      const teamResponse = await axios.get(`${API_BASE_URL}/api/teams/my-team`);
-      setTeam(teamResponse.data);
-      
       setShowCreateForm(false);
       setCreateForm({ name: '', description: '', max_members: 5 });
     } catch (err) {
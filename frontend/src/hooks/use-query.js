@@ -0,0 +1,46 @@
+import { useCallback, useEffect, useSyncExternalStore } from 'react';
+import { fetchQuery, getQueryState, subscribeQuery } from '../lib/api';
+
+export const STALE_TIMES = {
+  short: 10 * 1000,
+  default: 30 * 1000,
+  forever: Infinity
+};
+
+// Read `key` from the shared query cache, rendering cached data immediately and
+// revalidating in the background once it is older than `staleTime`.
+export function useQuery(key, fetcher, { staleTime = STALE_TIMES.default, enabled = true } = {}) {
+  const subscribe = useCallback(
+    (callback) => subscribeQuery(key, fetcher, callback),
+    // The fetcher is derived from the key, so it does not need to be a dependency
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+    [key]
+  );
+  const state = useSyncExternalStore(subscribe, () => getQueryState(key));
+  // True when the entry has never loaded or was cleared, e.g. on login or logout
+  const empty = state.updatedAt === 0 && !state.promise && !state.error;
+
+  useEffect(() => {
+    if (!enabled) {
+      return;
+    }
+    const entry = getQueryState(key);
+    // Never-loaded entries are always fetched, even with an infinite stale time
+    if (entry.updatedAt === 0 || Date.now() - entry.updatedAt > staleTime) {
+      fetchQuery(key, fetcher).catch((error) => {
+        console.error(`Failed to fetch ${key}:`, error);
+      });
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [key, enabled, staleTime, empty]);
+
+  const refetch = useCallback(() => fetchQuery(key, fetcher), [key, fetcher]);
+
+  return {
+    data: state.data,
+    error: state.error,
+    loading: enabled && state.data === undefined && !state.error,
+    fetching: Boolean(state.promise),
+    refetch
+  };
+}
@@ -0,0 +1,114 @@
+import axios from 'axios';
+
+const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
+
+const COLUMNAR_MEDIA_TYPE = 'application/vnd.scrims.columnar+json';
+
+// Rebuild a list of objects from { length, columns: { field: [values] }, missing },
+// leaving out the keys `missing` says an item never had
+export const fromColumnar = ({ length, columns, missing = {} }) => {
+  const fields = Object.keys(columns);
+  const absent = {};
+  for (const field of Object.keys(missing)) {
+    absent[field] = new Set(missing[field]);
+  }
+  const items = new Array(length);
+  for (let i = 0; i < length; i++) {
+    const item = {};
+    for (const field of fields) {
+      if (!absent[field]?.has(i)) {
+        item[field] = columns[field][i];
+      }
+    }
+    items[i] = item;
+  }
+  return items;
+};
+
+// GET a list endpoint, asking for the compact columnar encoding when the server supports it
+export const getList = async (path) => {
+  const response = await axios.get(`${API_BASE_URL}${path}`, {
+    headers: { Accept: `${COLUMNAR_MEDIA_TYPE}, application/json;q=0.9` }
+  });
+  const contentType = response.headers['content-type'] || '';
+  return contentType.includes(COLUMNAR_MEDIA_TYPE) ? fromColumnar(response.data) : response.data;
+};
+
+export const getJSON = async (path) => {
+  const response = await axios.get(`${API_BASE_URL}${path}`);
+  return response.data;
+};
+
+// Shared query cache, keyed by API path. Every page reading the same key shares
+// one entry and at most one request in flight.
+const queryCache = new Map();
+const queryFetchers = new Map();
+const querySubscribers = new Map();
+
+const EMPTY_ENTRY = { data: undefined, error: null, updatedAt: 0, promise: null };
+
+const setEntry = (key, entry) => {
+  queryCache.set(key, entry);
+  querySubscribers.get(key)?.forEach((callback) => callback());
+};
+
+export const getQueryState = (key) => queryCache.get(key) || EMPTY_ENTRY;
+
+export const subscribeQuery = (key, fetcher, callback) => {
+  queryFetchers.set(key, fetcher);
+  if (!querySubscribers.has(key)) {
+    querySubscribers.set(key, new Set());
+  }
+  querySubscribers.get(key).add(callback);
+  return () => querySubscribers.get(key).delete(callback);
+};
+
+// Start a request for `key`, or join the one already in flight
+export const fetchQuery = (key, fetcher = queryFetchers.get(key)) => {
+  const entry = getQueryState(key);
+  if (entry.promise) {
+    return entry.promise;
+  }
+
+  const promise = fetcher().then(
+    (data) => {
+      // Ignore responses that were invalidated while in flight
+      if (getQueryState(key).promise === promise) {
+        setEntry(key, { data, error: null, updatedAt: Date.now(), promise: null });
+      }
+      return data;
+    },
+    (error) => {
+      if (getQueryState(key).promise === promise) {
+        setEntry(key, { ...getQueryState(key), error, promise: null });
+      }
+      throw error;
+    }
+  );
+  setEntry(key, { ...entry, promise });
+  return promise;
+};
+
+// Mark every key starting with one of `prefixes` stale and refetch the ones on screen.
+// Cached data stays visible until the fresh response arrives.
+export const invalidateQueries = (...prefixes) => {
+  const refetches = [];
+  for (const key of queryCache.keys()) {
+    if (!prefixes.some((prefix) => key.startsWith(prefix))) {
+      continue;
+    }
+    setEntry(key, { ...getQueryState(key), updatedAt: 0, promise: null });
+    if (querySubscribers.get(key)?.size && queryFetchers.has(key)) {
+      refetches.push(fetchQuery(key).catch(() => {}));
+    }
+  }
+  return Promise.all(refetches);
+};
+
+// Cached data belongs to the signed-in user, drop it when they change.
+// Mounted pages are notified so they stop showing the previous user's data.
+export const clearQueryCache = () => {
+  const keys = [...queryCache.keys()];
+  queryCache.clear();
+  keys.forEach((key) => querySubscribers.get(key)?.forEach((callback) => callback()));
+};